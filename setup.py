@@ -36,7 +36,8 @@ extras_require = {
         'pytest-cov',
         'pint',
         'poetry2setup',
-    ]
+    ],
+    'performance': ['uvloop; sys_platform != "win32"', 'numba'],
 }
 
 entry_points = {
@@ -27,9 +27,23 @@ import asyncio
 import logging
 import selectors
 import socket
+import struct
+import sys
+from typing import Any
 from typing import Dict
-
-from .streaming._pickle import _squash_pickle_diff_queue
+from typing import Iterable
+from typing import Optional
+from typing import Set
+from typing import Union
+
+try:
+    import uvloop
+except ImportError:
+    _uvloop_available = False
+else:
+    _uvloop_available = True
+
+from .streaming._pickle import _MAX_DIFF
 from .streaming._pickle import deserialize_pickle_diff
 from .streaming._pickle import PickleDiff
 from .streaming._pickle import serialize_pickle_diff
@@ -48,7 +62,7 @@ _OPS_TIMEOUT = 10
 # timeout (s) for receive connections
 _TIMEOUT = (_KEEPALIVE_TIMEOUT + _OPS_TIMEOUT) + 1
 
-# maximum size of the data queue
+# maximum size of the data queue for sources and sinks
 _QUEUE_SIZE = 5
 
 # indicates that the client is requesting some data about the server
@@ -67,6 +81,12 @@ _FAST_TIMEOUT = 1.0
 
 # length (bytes) of the header section that identifies how large the payload is
 _HEADER_MSG_LEN = 8
+# packs/unpacks the header section (little-endian unsigned 64-bit payload length)
+_HEADER_STRUCT = struct.Struct('<Q')
+
+# pickles larger than this (bytes) are deserialized in a worker thread so that the
+# event loop can keep servicing other sockets in the meantime
+_EXECUTOR_THRESHOLD = 256 * 1024
 
 
 class _CustomSock:
@@ -83,6 +103,17 @@ class _CustomSock:
         # (ip addr, port) of the client
         self.addr = sock_writer.get_extra_info('peername')
 
+        raw_sock = sock_writer.get_extra_info('socket')
+        if raw_sock is not None:
+            try:
+                # send small messages (e.g. keepalives) immediately rather than
+                # waiting to coalesce them with later data (Nagle's algorithm) -
+                # asyncio and uvloop already do this for TCP streams, so this is
+                # only belt-and-braces for other event loops
+                raw_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as err:
+                _logger.debug(f'Failed setting socket options for [{self.addr}]: {err}')
+
     async def recv_msg(self) -> bytes:
         """Receive a message through a socket by decoding the header then reading
         the rest of the message"""
@@ -90,27 +121,43 @@ class _CustomSock:
         # the header bytes we receive from the client should identify
         # the length of the message payload
         msg_len_bytes = await self.sock_reader.readexactly(_HEADER_MSG_LEN)
-        msg_len = int.from_bytes(msg_len_bytes, byteorder='little')
+        (msg_len,) = _HEADER_STRUCT.unpack(msg_len_bytes)
+
+        if msg_len == 0:
+            # keepalive message - there is no payload to wait for
+            _logger.debug('Received keepalive from [%s].', self.addr)
+            return b''
 
         # get the payload
         msg = await self.sock_reader.readexactly(msg_len)
 
-        _logger.debug(f'Received [{msg_len}] bytes from [{self.addr}].')
+        _logger.debug('Received [%d] bytes from [%s].', msg_len, self.addr)
 
         return msg
 
-    async def send_msg(self, msg: bytes):
+    async def send_msg(self, msg: Union[bytes, bytearray, memoryview]):
         """Send a byte message through a socket interface by encoding the header
-        then sending the rest of the message"""
+        then sending the rest of the message. The message can be any bytes-like
+        object, so the same buffer can be sent to several sockets without copying
+        it."""
 
-        # calculate the payload length and package it into bytes
-        msg_len_bytes = len(msg).to_bytes(_HEADER_MSG_LEN, byteorder='little')
+        # length of the payload in bytes
+        if isinstance(msg, memoryview):
+            msg_len = msg.nbytes
+        else:
+            msg_len = len(msg)
+
+        # package the payload length into bytes - this creates a new header
+        # object every time rather than packing into a reused buffer, since the
+        # transport may still reference the previous header after drain()
+        msg_len_bytes = _HEADER_STRUCT.pack(msg_len)
 
-        # send the header + payload
-        self.sock_writer.write(msg_len_bytes + msg)
+        # send the header + payload - writelines avoids allocating a copy of
+        # the (potentially large) payload just to prepend the header
+        self.sock_writer.writelines((msg_len_bytes, msg))
         await self.sock_writer.drain()
 
-        _logger.debug(f'Sent [{len(msg)}] bytes to {self.addr}.')
+        _logger.debug('Sent [%d] bytes to %s.', msg_len, self.addr)
 
     async def close(self):
         """Fully close a socket connection"""
@@ -119,8 +166,63 @@ class _CustomSock:
         _logger.debug(f'Closed socket [{self.addr}].')
 
 
-async def _cleanup_event_loop(loop):
-    """End all tasks in an event loop and exit."""
+class _DeadlineTimer:
+    """Runs a callback if the timer isn't reset within a timeout. Resetting the
+    timer only moves its deadline (rather than rescheduling a new timer), so it is
+    cheap enough to do for every message."""
+
+    def __init__(self, event_loop: asyncio.AbstractEventLoop, timeout: float, callback):
+        """
+        Args:
+            event_loop: Event loop to run the timer on.
+            timeout: Time (s) after the most recent reset to run the callback.
+            callback: Function to run when the timer expires.
+        """
+        self.event_loop = event_loop
+        self.timeout = timeout
+        self.callback = callback
+        # whether the callback was run since the last reset
+        self.expired = False
+        self.handle = None
+        self.reset()
+
+    def reset(self):
+        """Restart the timeout."""
+        self.deadline = self.event_loop.time() + self.timeout
+        self.expired = False
+        if self.handle is None:
+            self.handle = self.event_loop.call_at(self.deadline, self._expire)
+
+    def cancel(self):
+        """Stop the timer without running the callback."""
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def _expire(self):
+        """Run the callback if the deadline has passed."""
+        if self.event_loop.time() < self.deadline:
+            # the timer was reset since it was scheduled
+            self.handle = self.event_loop.call_at(self.deadline, self._expire)
+        else:
+            self.handle = None
+            self.expired = True
+            self.callback()
+
+
+def _track_task(tasks: Set[asyncio.Task], task: asyncio.Task):
+    """Add a task to a set of tasks, and remove it again once it is done."""
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+
+async def _cleanup_event_loop(loop, tasks: Optional[Iterable[asyncio.Task]] = None):
+    """End tasks in an event loop and exit.
+
+    Args:
+        loop: Event loop to shut down.
+        tasks: Tasks to end. If None, all tasks in the event loop are ended.
+    """
 
     if not loop.is_running():
         _logger.warning(
@@ -128,9 +230,12 @@ async def _cleanup_event_loop(loop):
         )
         return
 
+    if tasks is None:
+        tasks = asyncio.all_tasks(loop=loop)
+
     # gather all of the tasks except this one
     pending_tasks = []
-    for task in asyncio.all_tasks(loop=loop):
+    for task in tasks:
         if task is not asyncio.current_task():
             pending_tasks.append(task)
 
@@ -156,11 +261,16 @@ class _DataSet:
         # {('127.0.0.1', 13445):
         #           {'task': asyncio task object for sink,
         #           'sock': socket for the sink,
-        #           'queue': sink FIFO/queue},
+        #           'pickle_diff': PickleDiff waiting to be sent (or None),
+        #           'pickle': serialized 'pickle_diff' if known (or None),
+        #           'squashed': True if 'pickle_diff' is owned by this sink,
+        #           'event': set when 'pickle_diff' is available},
         # ('192.168.1.5', 19859): ... }
         self.sinks = {}
         # for storing the full history of the data
         self.pickle_diff = None
+        # source and sink tasks that are currently running
+        self.tasks: Set[asyncio.Task] = set()
 
     async def run_sink(
         self,
@@ -177,84 +287,130 @@ class _DataSet:
         assert sink_id not in self.sinks
         # create the sink task
         task = asyncio.create_task(self._sink_coro(event_loop, sink_id))
-        # create a queue for the sink
-        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        _track_task(self.tasks, task)
         # add the sink data to the DataSet
-        sink_dict = {
+        sink_dict: Dict[str, Any] = {
             'task': task,
             'sock': sock,
-            'queue': queue,
+            'pickle_diff': None,
+            'pickle': None,
+            'squashed': False,
+            'event': asyncio.Event(),
         }
         self.sinks[sink_id] = sink_dict
-        # push the full current data to the sink so it has a starting point
-        queue.put_nowait(self.pickle_diff)
+        if self.pickle_diff is not None:
+            # push the full current data to the sink so it has a starting point -
+            # take a copy since the source will keep squashing into self.pickle_diff
+            initial_pickle_diff = PickleDiff()
+            initial_pickle_diff.squash(self.pickle_diff)
+            sink_dict['pickle_diff'] = initial_pickle_diff
+            sink_dict['squashed'] = True
+            sink_dict['event'].set()
         await task
 
     async def run_source(self, sock: _CustomSock):
         """Run a data source until it closes."""
         task = asyncio.create_task(self._source_coro())
+        _track_task(self.tasks, task)
         self.source = {'task': task, 'sock': sock}
         await task
 
     async def _source_coro(self):
         """Receive data from a source client and transfer it to the sink client
-        queues."""
+        pickle diff slots."""
         sock = self.source['sock']
+        event_loop = asyncio.get_running_loop()
         # reset the PickleDiff since there is a new source
         self.pickle_diff = PickleDiff()
+        # cancel this task if the source doesn't send a message in time
+        task = asyncio.current_task()
+        assert task is not None
+        recv_timer = _DeadlineTimer(event_loop, _TIMEOUT, task.cancel)
         try:
             while True:
                 try:
-                    new_data = await asyncio.wait_for(sock.recv_msg(), timeout=_TIMEOUT)
-                except (asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
-                    # if there was a timeout / problem receiving the message
+                    new_data = await sock.recv_msg()
+                except asyncio.IncompleteReadError as exc:
+                    # if there was a problem receiving the message
                     # the source client is dead and will be terminated
                     _logger.debug(
-                        f'Source [{sock.addr}] disconnected or hasn\'t sent a '
-                        'keepalive message - dropping connection.'
+                        f'Source [{sock.addr}] disconnected - dropping connection.'
                     )
                     raise asyncio.CancelledError from exc
+                recv_timer.reset()
 
                 if len(new_data):
                     _logger.debug(
-                        f'Source [{sock.addr}] received pickle of '
-                        f'[{len(new_data)}] bytes.'
+                        'Source [%s] received pickle of [%d] bytes.',
+                        sock.addr,
+                        len(new_data),
                     )
                     # deserialize the PickleDiff
-                    new_pickle_diff = deserialize_pickle_diff(new_data)
+                    if len(new_data) > _EXECUTOR_THRESHOLD:
+                        new_pickle_diff = await event_loop.run_in_executor(
+                            None, deserialize_pickle_diff, new_data
+                        )
+                    else:
+                        new_pickle_diff = deserialize_pickle_diff(new_data)
                     # combine the new pickle diff with what is stored on the server
                     self.pickle_diff.squash(new_pickle_diff)
-                    for sink_id in self.sinks:
-                        sink = self.sinks[sink_id]
-                        queue = sink['queue']
-                        try:
-                            queue.put_nowait(new_pickle_diff)
-                        except asyncio.QueueFull:
+                    # check once rather than formatting log messages for every sink
+                    log_debug = _logger.isEnabledFor(logging.DEBUG)
+                    for sink in self.sinks.values():
+                        pending_pickle_diff = sink['pickle_diff']
+                        if pending_pickle_diff is None:
+                            # the sink has sent everything, so it can share the
+                            # (read-only) pickle diff with the other sinks, and
+                            # forward the bytes received from the source rather
+                            # than re-serializing it for every sink
+                            sink['pickle_diff'] = new_pickle_diff
+                            sink['pickle'] = new_data
+                        else:
                             # the sink isn't consuming data fast enough
-                            _logger.debug(
-                                f'Sink [{sink["sock"].addr}] can\'t keep up '
-                                'with data source.'
-                            )
-                            if not _squash_pickle_diff_queue(queue, new_pickle_diff):
+                            if log_debug:
+                                _logger.debug(
+                                    f'Sink [{sink["sock"].addr}] can\'t keep up '
+                                    'with data source.'
+                                )
+                            if not sink['squashed']:
+                                # the pending pickle diff may be shared with other
+                                # sinks, so squash into a new one owned by this sink
+                                pending_pickle_diff = PickleDiff()
+                                pending_pickle_diff.squash(sink['pickle_diff'])
+                                sink['pickle_diff'] = pending_pickle_diff
+                                sink['squashed'] = True
+                            pending_pickle_diff.squash(new_pickle_diff)
+                            sink['pickle'] = None
+                            if len(pending_pickle_diff) > _MAX_DIFF:
                                 _logger.warning(
-                                    f'Cancelling sink [{sink_id}] because the '
-                                    'max diff size was exceeded. This is a '
+                                    f'Cancelling sink [{sink["sock"].addr}] because '
+                                    'the max diff size was exceeded. This is a '
                                     'consequence of memory build-up due to the '
                                     'sink not being able to keep up with the '
                                     'data rate. Reduce the data rate or '
                                     'increase the client processing throughput.'
                                 )
-                                self.sinks[sink_id]['task'].cancel()
-                        _logger.debug(
-                            f'Source [{sock.addr}] queued pickle for sink '
-                            f'[{sink["sock"].addr}].'
-                        )
+                                sink['task'].cancel()
+                        # wake up the sink
+                        sink['event'].set()
+                        if log_debug:
+                            _logger.debug(
+                                f'Source [{sock.addr}] queued pickle for sink '
+                                f'[{sink["sock"].addr}].'
+                            )
                 else:
                     # the server just sent a keepalive signal
-                    _logger.debug(f'Source [{sock.addr}] received keepalive.')
+                    _logger.debug('Source [%s] received keepalive.', sock.addr)
         except asyncio.CancelledError as exc:
+            if recv_timer.expired:
+                # the source client is dead and will be terminated
+                _logger.debug(
+                    f'Source [{sock.addr}] hasn\'t sent a keepalive message - '
+                    'dropping connection.'
+                )
             raise asyncio.CancelledError from exc
         finally:
+            recv_timer.cancel()
             _logger.info(f'Dropped source [{sock.addr}].')
             self.source = None
 
@@ -263,44 +419,69 @@ class _DataSet:
         event_loop: asyncio.AbstractEventLoop,
         sink_id: tuple,
     ):
-        """Receive source data from the queue"""
-        sock = self.sinks[sink_id]['sock']
-        queue = self.sinks[sink_id]['queue']
+        """Receive source data from the sink's pickle diff slot"""
+        sink = self.sinks[sink_id]
+        sock = sink['sock']
+        event = sink['event']
+        # wake up the sink to send a keepalive message if nothing has been sent
+        # recently
+        keepalive_timer = _DeadlineTimer(event_loop, _KEEPALIVE_TIMEOUT, event.set)
+        # cancel this task if sending a message takes too long - the sink sends
+        # something at least every _KEEPALIVE_TIMEOUT, so it is considered stuck
+        # if the latest send hasn't finished _OPS_TIMEOUT / 4 after that
+        task = asyncio.current_task()
+        assert task is not None
+        send_timer = _DeadlineTimer(
+            event_loop, _KEEPALIVE_TIMEOUT + _OPS_TIMEOUT / 4, task.cancel
+        )
         try:
             while True:
-                try:
-                    # get pickle data from the queue
-                    pickle_diff = await asyncio.wait_for(
-                        queue.get(), timeout=_KEEPALIVE_TIMEOUT
-                    )
-                    queue.task_done()
-                    _logger.debug(f'Sink [{sock.addr}] got pickle diff from queue.')
-                except asyncio.TimeoutError:
+                # wait for pickle data to be available (or a keepalive to be due)
+                await event.wait()
+                # take the pending pickle diff and empty the slot
+                pickle_diff = sink['pickle_diff']
+                pickle = sink['pickle']
+                sink['pickle_diff'] = None
+                sink['pickle'] = None
+                sink['squashed'] = False
+                event.clear()
+                if pickle_diff is None:
                     # if there's no data available, send a keepalive message
                     _logger.debug(
-                        f'Sink [{sock.addr}] no data available - sending keepalive.'
+                        'Sink [%s] no data available - sending keepalive.', sock.addr
                     )
                     new_data = b''
                 else:
-                    new_data = serialize_pickle_diff(pickle_diff)
+                    _logger.debug('Sink [%s] got pickle diff.', sock.addr)
+                    if pickle is None:
+                        new_data = serialize_pickle_diff(pickle_diff)
+                    else:
+                        # the pickle diff is unmodified since it was received
+                        # from the source
+                        new_data = pickle
 
                 try:
-                    await asyncio.wait_for(
-                        sock.send_msg(new_data),
-                        timeout=_OPS_TIMEOUT / 4,
-                    )
+                    await sock.send_msg(new_data)
                     _logger.debug(
-                        f'Sink [{sock.addr}] sent ' f'[{len(new_data)}] bytes.'
+                        'Sink [%s] sent [%d] bytes.', sock.addr, len(new_data)
                     )
-                except (ConnectionError, asyncio.TimeoutError) as exc:
+                except ConnectionError as exc:
                     _logger.info(
-                        f'Sink [{sock.addr}] disconnected or isn\'t '
-                        'accepting data - dropping connection.'
+                        f'Sink [{sock.addr}] disconnected - dropping connection.'
                     )
                     raise asyncio.CancelledError from exc
+                keepalive_timer.reset()
+                send_timer.reset()
         except asyncio.CancelledError as exc:
+            if send_timer.expired:
+                _logger.info(
+                    f'Sink [{sock.addr}] isn\'t accepting data - dropping '
+                    'connection.'
+                )
             raise asyncio.CancelledError from exc
         finally:
+            keepalive_timer.cancel()
+            send_timer.cancel()
             self.sinks.pop(sink_id)
             _logger.debug(f'Dropped sink [{sock.addr}].')
 
@@ -309,26 +490,27 @@ class DataServer:
     """
     The server has a set of DataSet objects. Each has 1 data source, and any number of
     data sinks. Pickled object data from the source is received on its socket, then
-    transferred to the FIFO of every sink. The pickle is then sent out on the sink's
+    transferred to the pending slot of every sink (where it is squashed with any
+    data that hasn't been sent yet). The pickle is then sent out on the sink's
     socket.
     E.g.::
 
         self.datasets = {
 
         'dataset1' : _DataSet(
-        socket (source) ----------> FIFO ------> socket (sink 1)
+        socket (source) ----------> slot ------> socket (sink 1)
                            |
-                            ------> FIFO ------> socket (sink 2)
+                            ------> slot ------> socket (sink 2)
         ),
 
         'dataset2' : _DataSet(
-        socket (source) ----------> FIFO ------> socket (sink 1)
+        socket (source) ----------> slot ------> socket (sink 1)
                            |
-                            ------> FIFO ------> socket (sink 2)
+                            ------> slot ------> socket (sink 2)
                            |
-                            ------> FIFO ------> socket (sink 3)
+                            ------> slot ------> socket (sink 3)
                            |
-                            ------> FIFO ------> socket (sink 4)
+                            ------> slot ------> socket (sink 4)
         ),
 
         ... }
@@ -336,18 +518,27 @@ class DataServer:
     """
 
     def __init__(self, port: int = DATASERV_PORT):
-        """
+        """If `uvloop <https://github.com/MagicStack/uvloop>`__ is installed, it
+        will be used to run the server (except on Windows, which it doesn't support).
+
         Args:
             port: TCP/IP port of the data server
         """
         self.port = port
         # a dictionary with string identifiers mapping to DataSet objects
         self.datasets: Dict[str, _DataSet] = {}
+        # server and client negotiation tasks that are currently running
+        self.tasks: Set[asyncio.Task] = set()
         # asyncio event loop for running all the server tasks
-        # for some reason there are performance issues on windows when using the
-        # ProactorEventLoop
-        selector = selectors.SelectSelector()
-        self.event_loop = asyncio.SelectorEventLoop(selector)
+        self.event_loop: asyncio.AbstractEventLoop
+        if _uvloop_available and sys.platform != 'win32':
+            # libuv-based event loop, which is significantly faster (if installed)
+            self.event_loop = uvloop.new_event_loop()
+        else:
+            # for some reason there are performance issues on windows when using
+            # the ProactorEventLoop
+            selector = selectors.SelectSelector()
+            self.event_loop = asyncio.SelectorEventLoop(selector)
 
     def serve_forever(self):
         """Run the asyncio event loop - ayncio requires this be run in the main thread
@@ -365,15 +556,22 @@ class DataServer:
     def stop(self):
         """Stop the asyncio event loop."""
         if self.event_loop.is_running():
-            asyncio.run_coroutine_threadsafe(
-                _cleanup_event_loop(self.event_loop), self.event_loop
-            )
+            asyncio.run_coroutine_threadsafe(self._cleanup(), self.event_loop)
         else:
             raise RuntimeError('Tried stopping the data server but it isn\'t running!')
 
+    async def _cleanup(self):
+        """End all of the server tasks and stop the event loop."""
+        # only the tracked tasks need to be ended, rather than walking every
+        # task in the event loop
+        tasks = list(self.tasks)
+        for dataset in self.datasets.values():
+            tasks.extend(dataset.tasks)
+        await _cleanup_event_loop(self.event_loop, tasks)
+
     def _main_helper(self):
         """Callback function to start _main"""
-        asyncio.create_task(self._main())
+        _track_task(self.tasks, asyncio.create_task(self._main()))
 
     async def _main(self):
         """Socket server listening coroutine"""
@@ -394,6 +592,8 @@ class DataServer:
         """Coroutine that determines what kind of client has connected, and deal
         with it accordingly"""
 
+        _track_task(self.tasks, asyncio.current_task())
+
         # custom socket wrapper for sending / receiving structured messages
         sock = _CustomSock(sock_reader, sock_writer)
 
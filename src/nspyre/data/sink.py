@@ -196,8 +196,9 @@ class DataSink(AsyncioWorker):
                         continue
 
                     _logger.debug(
-                        f'Sink received pickle of [{len(new_data)}] bytes from data '
-                        f'server [{sock.addr}].'
+                        'Sink received pickle of [%d] bytes from data server [%s].',
+                        len(new_data),
+                        sock.addr,
                     )
 
                     pickle_diff = deserialize_pickle_diff(new_data)
@@ -223,7 +224,7 @@ class DataSink(AsyncioWorker):
                                 'the data rate. Reduce the data rate or '
                                 'increase the client processing throughput.'
                             ) from err
-                    _logger.debug(f'Sink queued pickle of [{len(new_data)}] bytes.')
+                    _logger.debug('Sink queued pickle of [%d] bytes.', len(new_data))
                 await asyncio.sleep(_FAST_TIMEOUT)
 
         except ConnectionError as err:
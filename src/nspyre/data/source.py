@@ -131,7 +131,8 @@ class DataSource(AsyncioWorker):
                         )
                         _logger.debug(
                             'Source dequeued pickle diff - sending to data server '
-                            f'[{sock.addr}].'
+                            '[%s].',
+                            sock.addr,
                         )
                     except asyncio.TimeoutError:
                         # if there's no data available, send a keepalive message
@@ -140,8 +141,10 @@ class DataSource(AsyncioWorker):
                     else:
                         new_data = serialize_pickle_diff(pickle_diff)
                         _logger.debug(
-                            f'Source sending pickle of [{len(new_data)}] bytes to data '
-                            f'server [{sock.addr}].'
+                            'Source sending pickle of [%d] bytes to data server '
+                            '[%s].',
+                            len(new_data),
+                            sock.addr,
                         )
 
                     # send the data to the server
@@ -150,8 +153,9 @@ class DataSource(AsyncioWorker):
                             sock.send_msg(new_data), timeout=_OPS_TIMEOUT
                         )
                         _logger.debug(
-                            f'Source sent pickle of [{len(new_data)}] bytes to data '
-                            f'server [{sock.addr}].'
+                            'Source sent pickle of [%d] bytes to data server [%s].',
+                            len(new_data),
+                            sock.addr,
                         )
                         if new_data:
                             # mark that the queue data has been fully processed
@@ -196,7 +200,7 @@ class DataSource(AsyncioWorker):
             # the server isn't accepting data fast enough
             # so we will empty the queue and merge all of its entries
             _logger.debug(
-                f'Data server [{(self._addr, self._port)}] can\'t keep up with source.'
+                'Data server [%s] can\'t keep up with source.', (self._addr, self._port)
             )
             if not _squash_pickle_diff_queue(self._queue, pickle_diff):
                 raise RuntimeError(
@@ -14,6 +14,7 @@ from typing import Any
 from typing import Dict
 from typing import Optional
 
+from .list import _diff_ops_len
 from .list import StreamingList
 
 # maximum length of a diff
@@ -29,8 +30,9 @@ class PickleDiff:
         """
         Args:
             pkl: Byte string from pickle operation.
-            diffs: Dict where keys are uid and values are lists of diffs as
-                dictated by the corresponding class-specific code in
+            diffs: Dict where keys are uid and values are diffs in the form
+                [ops, idxs, vals] (parallel arrays of operation codes, indices,
+                and values) as dictated by the corresponding class-specific code in
                 :py:meth:`~nspyre.data.streaming._pickle.StreamingPickler.persistent_id`.
         """
         if pkl is None:
@@ -55,15 +57,20 @@ class PickleDiff:
             if uid in self.diffs:
                 # self.diffs already has a record for the streaming object given
                 # by uid, so we will combine their diffs
-                self.diffs[uid].extend(pd.diffs[uid])
+                for arr, new_arr in zip(self.diffs[uid], pd.diffs[uid]):
+                    arr.extend(new_arr)
             else:
                 # there is a new streaming object entry, so add it to the self.diffs
-                self.diffs[uid] = pd.diffs[uid]
+                # - copy the diff arrays so that later squashes into self don't
+                # modify pd
+                ops, idxs, vals = pd.diffs[uid]
+                self.diffs[uid] = [bytearray(ops), list(idxs), list(vals)]
 
     def __len__(self):
         total = 0
         for d in self.diffs:
-            total += len(self.diffs[d])
+            # number of items in the diff operations
+            total += _diff_ops_len(self.diffs[d])
         return total
 
     def __str__(self):
@@ -117,8 +124,9 @@ class StreamingPickler(Pickler):
         uid = id(obj)
         if isinstance(obj, StreamingList):
             # update the internal diffs dictionary
-            self.diff_stream_data[uid] = obj.diff_ops.copy()
-            # reset the object's diffs
+            self.diff_stream_data[uid] = obj._get_diff_ops()
+            # reset the object's diffs - this replaces (rather than clears) its diff
+            # arrays, so no copy is needed
             obj._clear_diff_ops()
             # return the uid of the object
             return ('StreamingList', uid)
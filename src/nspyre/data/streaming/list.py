@@ -1,3 +1,44 @@
+_OP_INSERT = ord('i')
+_OP_DELETE = ord('d')
+_OP_UPDATE = ord('u')
+_OP_CLEAR = ord('c')
+_OP_SORT = ord('s')
+_OP_REVERSE = ord('r')
+_OP_EXTEND = ord('e')
+
+
+def _diff_ops_to_tuples(diff_ops):
+    """Convert diff operation arrays in the form [ops, idxs, vals] to a list of
+    tuples of the form (op,), (op, idx), (op, val), or (op, idx, val)."""
+    ops, idxs, vals = diff_ops
+    tuples = []
+    for op, idx, val in zip(ops, idxs, vals):
+        if op in (_OP_CLEAR, _OP_REVERSE):
+            tuples.append((chr(op),))
+        elif op == _OP_SORT:
+            tuples.append((chr(op), val))
+        elif op == _OP_DELETE:
+            tuples.append((chr(op), idx))
+        else:
+            tuples.append((chr(op), idx, val))
+    return tuples
+
+
+def _diff_ops_len(diff_ops):
+    """Return the number of items carried by diff operation arrays in the form
+    [ops, idxs, vals]. Extends and slice updates count once per value, so that a
+    single large operation counts as much as the equivalent individual ones."""
+    ops, idxs, vals = diff_ops
+    total = 0
+    for op, idx, val in zip(ops, idxs, vals):
+        if op == _OP_EXTEND or (op == _OP_UPDATE and isinstance(idx, slice)):
+            # a single operation carrying many values
+            total += len(val) if hasattr(val, '__len__') else 1
+        else:
+            total += 1
+    return total
+
+
 class StreamingList(list):
     """List-like object that can be streamed efficiently through the \
     :py:class:`~nspyre.data.server.DataServer`.
@@ -52,11 +93,16 @@ class StreamingList(list):
                 with, e.g. :code:`sl = StreamingList([1, 2, 3])`.
         """
         super().__init__()
-        # A list of operations that have been performed on the list since the
-        # last update. A list of tuples where the first tuple element is the
-        # operation type, and the subsequent elements are (optional) objects
-        # for that operation.
-        self.diff_ops = []
+        # Record of the operations that have been performed on the list since
+        # the last update, stored as parallel arrays (rather than a list of
+        # tuples) so that registering an operation doesn't allocate a new
+        # object. Entry i of each array describes operation i.
+        # operation type codes
+        self._ops = bytearray()
+        # indices (or slices) that the operations apply to
+        self._idxs = []
+        # values for the operations (None if the operation has no value)
+        self._vals = []
         # initialize the list contents
         if iterable is not None:
             for i in iterable:
@@ -75,13 +121,31 @@ class StreamingList(list):
             raise ValueError(f'Invalid index [{idx}].') from err
         self._diff_op('u', idx, self[idx])
 
-    def _diff_op(self, op, *args):
-        """Add an entry to the diff_ops list."""
-        self.diff_ops.append((op,) + tuple(args))
+    @property
+    def diff_ops(self):
+        """List of the operations that have been performed on the list since the
+        last update. Each operation is a tuple where the first element is the
+        operation type, and the subsequent elements are (optional) objects for
+        that operation."""
+        return _diff_ops_to_tuples(self._get_diff_ops())
+
+    def _diff_op(self, op, idx, val=None):
+        """Add an entry to the diff operation arrays."""
+        self._ops.append(ord(op))
+        self._idxs.append(idx)
+        self._vals.append(val)
+
+    def _get_diff_ops(self):
+        """Return the diff operation arrays in the form [ops, idxs, vals]."""
+        return [self._ops, self._idxs, self._vals]
 
     def _clear_diff_ops(self):
         """Reset the record of operations that have been performed on the list."""
-        self.diff_ops.clear()
+        # create new arrays rather than clearing the old ones in case they are
+        # still referenced by e.g. a pickler
+        self._ops = bytearray()
+        self._idxs = []
+        self._vals = []
 
     def _regenerate_diffops(self):
         """Generate a new diffops array."""
@@ -90,18 +154,33 @@ class StreamingList(list):
             self._diff_op('i', idx, val)
 
     def _merge(self, diff_ops):
-        """Merge the changes given by diff_ops into the list."""
-        if self.diff_ops != []:
+        """Merge the changes given by diff_ops into the list.
+
+        Args:
+            diff_ops: Diff operation arrays in the form [ops, idxs, vals], as
+                returned by :py:meth:`_get_diff_ops`.
+        """
+        if len(self._ops):
             raise ValueError("can't merge because there are local changes.")
-        for i, op in enumerate(diff_ops):
-            if op[0] == 'i':
-                self.insert(op[1], op[2], register_diff=False)
-            elif op[0] == 'd':
-                self.__delitem__(op[1], register_diff=False)
-            elif op[0] == 'u':
-                self.__setitem__(op[1], op[2], register_diff=False)
+        ops, idxs, vals = diff_ops
+        for i, (op, idx, val) in enumerate(zip(ops, idxs, vals)):
+            if op == _OP_INSERT:
+                self.insert(idx, val, register_diff=False)
+            elif op == _OP_DELETE:
+                self.__delitem__(idx, register_diff=False)
+            elif op == _OP_UPDATE:
+                self.__setitem__(idx, val, register_diff=False)
+            elif op == _OP_CLEAR:
+                self.clear(register_diff=False)
+            elif op == _OP_SORT:
+                self.sort(register_diff=False, **val)
+            elif op == _OP_REVERSE:
+                self.reverse(register_diff=False)
+            elif op == _OP_EXTEND:
+                # insert all of the items at the index where the extend started
+                self.__setitem__(slice(idx, idx), val, register_diff=False)
             else:
-                raise ValueError(f'unrecognized operation [{op}] at index [{i}]')
+                raise ValueError(f'unrecognized operation [{chr(op)}] at index [{i}]')
 
     def __add__(self, val):
         """See docs for Python list."""
@@ -156,27 +235,39 @@ class StreamingList(list):
         """See docs for Python list."""
         self.insert(len(self), val)
 
-    def extend(self, val):
+    def extend(self, val, register_diff=True):
         """See docs for Python list."""
-        for o in val:
-            self.append(o)
+        start = len(self)
+        # make a copy first in case val is an iterator or this list itself
+        vals = list(val)
+        super().extend(vals)
+        if register_diff:
+            # register a single diff for all of the items rather than one per item
+            self._diff_op('e', start, vals)
 
-    def clear(self):
+    def clear(self, register_diff=True):
         """See docs for Python list."""
-        for i in range(len(self)):
-            self.__delitem__(i)
+        super().clear()
+        if register_diff:
+            self._diff_op('c', None)
 
-    def sort(self, *args, **kwargs):
+    def sort(self, *, key=None, reverse=False, register_diff=True):
         """See docs for Python list."""
-        super().sort(*args, **kwargs)
-        for i in range(len(self)):
-            self.updated_item(i)
+        super().sort(key=key, reverse=reverse)
+        if register_diff:
+            if key is None:
+                self._diff_op('s', None, {'key': None, 'reverse': reverse})
+            else:
+                # a key function pickles by reference (e.g. as __main__.key), so
+                # the data server and sinks can't be relied on to load it - send
+                # the whole sorted list instead
+                self._diff_op('u', slice(None), list(self))
 
-    def reverse(self):
+    def reverse(self, register_diff=True):
         """See docs for Python list."""
         super().reverse()
-        for i in range(len(self)):
-            self.updated_item(i)
+        if register_diff:
+            self._diff_op('r', None)
 
     def copy(self):
         """See docs for Python list."""
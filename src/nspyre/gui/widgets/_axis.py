@@ -0,0 +1,17 @@
+from pyqtgraph import AxisItem
+from pyqtgraph.Qt import QtGui
+
+
+def configure_axis(axis: AxisItem, label: str, font: QtGui.QFont):
+    """Apply the nspyre default settings to a pyqtgraph plot axis.
+
+    Args:
+        axis: The pyqtgraph `AxisItem <https://pyqtgraph.readthedocs.io/en/latest/\
+            api_reference/graphicsItems/axisitem.html>`__ to configure.
+        label: Axis label text.
+        font: Font to use for the axis label and tick labels.
+    """
+    axis.setLabel(text=label)
+    axis.label.setFont(font)
+    axis.setTickFont(font)
+    axis.enableAutoSIPrefix(False)
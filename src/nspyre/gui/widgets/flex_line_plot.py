@@ -1,6 +1,7 @@
 import logging
 import time
 from typing import Callable
+from typing import Dict
 from typing import Optional
 
 import numpy as np
@@ -29,6 +30,58 @@ class _FlexLinePlotSeriesSettings:
         self.hidden = hidden
 
 
+class _AppendBuffer:
+    """Concatenates a list of numpy arrays of shape (2, n) along axis 1. The result
+    is stored in a buffer that is reused between calls, so if the list has only been
+    appended to since the previous call, only the new arrays need to be copied."""
+
+    def __init__(self):
+        # arrays that have already been copied into the buffer
+        self.arrays = []
+        # concatenated data - may have extra capacity past self.length
+        self.buf = None
+        # number of columns of the buffer that contain data
+        self.length = 0
+
+    def concatenate(self, arrays):
+        """Return the concatenation of arrays along axis 1.
+
+        Args:
+            arrays: List of numpy arrays of shape (2, n).
+        """
+        start = len(self.arrays)
+        if (
+            self.buf is None
+            or start > len(arrays)
+            or any(a is not b for a, b in zip(self.arrays, arrays))
+            or not all(np.can_cast(a.dtype, self.buf.dtype) for a in arrays[start:])
+        ):
+            # the list was modified other than by appending, so start over with a
+            # new buffer (views of the old one may still be in use by the plot)
+            start = 0
+            self.arrays = []
+            self.length = 0
+            dtype = np.result_type(*{a.dtype for a in arrays}) if arrays else float
+            self.buf = np.empty((2, 0), dtype=dtype)
+
+        new_arrays = arrays[start:]
+        new_length = self.length + sum(a.shape[1] for a in new_arrays)
+        if new_length > self.buf.shape[1]:
+            # grow geometrically so that appending is amortized O(new points)
+            buf = np.empty(
+                (2, max(new_length, 2 * self.buf.shape[1])), dtype=self.buf.dtype
+            )
+            buf[:, : self.length] = self.buf[:, : self.length]
+            self.buf = buf
+        for a in new_arrays:
+            n = a.shape[1]
+            self.buf[:, self.length : self.length + n] = a
+            self.length += n
+        self.arrays.extend(new_arrays)
+
+        return self.buf[:, : self.length]
+
+
 class _FlexLinePlotSettings(QThreadSafeObject):
     """Container class to hold the plot settings for a _FlexLinePlotWidget."""
 
@@ -586,6 +639,8 @@ class _FlexLinePlotWidget(LinePlotWidget):
         self.timeout = timeout
         self.data_processing_func = data_processing_func
         self.plot_settings = _FlexLinePlotSettings()
+        # _AppendBuffer for each plot that uses 'Append' processing
+        self.append_buffers: Dict[str, _AppendBuffer] = {}
         self.plot_settings.start()
         super().__init__()
 
@@ -705,7 +760,8 @@ class _FlexLinePlotWidget(LinePlotWidget):
     def update(self):
         """Update the plot if there is new data available."""
         with QtCore.QMutexLocker(self.plot_settings.sink_mutex):
-            if self.plot_settings.sink is None:
+            sink = self.plot_settings.sink
+            if sink is None:
                 # rate limit how often update() runs if there is no sink connected
                 time.sleep(0.1)
                 return
@@ -715,16 +771,25 @@ class _FlexLinePlotWidget(LinePlotWidget):
             else:
                 try:
                     # wait for new data to be available from the sink
-                    self.plot_settings.sink.pop(timeout=self.timeout)
+                    sink.pop(timeout=self.timeout)
                 except TimeoutError:
                     return
 
             if self.data_processing_func is not None:
-                self.data_processing_func(self.plot_settings.sink)
+                self.data_processing_func(sink)
+
+            # look up the data sets once rather than for every plot
+            datasets = sink.datasets
 
             with QtCore.QMutexLocker(self.plot_settings.mutex):
-                for plot_name in self.plot_settings.series_settings:
-                    settings = self.plot_settings.series_settings[plot_name]
+                # discard the buffers of plots that have been removed
+                for plot_name in (
+                    self.append_buffers.keys()
+                    - self.plot_settings.series_settings.keys()
+                ):
+                    del self.append_buffers[plot_name]
+
+                for plot_name, settings in self.plot_settings.series_settings.items():
                     series = settings.series
                     scan_i = settings.scan_i
                     scan_j = settings.scan_j
@@ -732,7 +797,7 @@ class _FlexLinePlotWidget(LinePlotWidget):
 
                     # pick out the particular data series
                     try:
-                        data = self.plot_settings.sink.datasets[series]
+                        data = datasets[series]
                     except KeyError:
                         _logger.error(f'Data series [{series}] does not exist.')
                         continue
@@ -778,7 +843,11 @@ class _FlexLinePlotWidget(LinePlotWidget):
 
                         if processing == 'Append':
                             # concatenate the numpy arrays
-                            processed_data = np.concatenate(data_subset, axis=1)
+                            if plot_name not in self.append_buffers:
+                                self.append_buffers[plot_name] = _AppendBuffer()
+                            processed_data = self.append_buffers[plot_name].concatenate(
+                                data_subset
+                            )
                         elif processing == 'Average':
                             # create a single numpy array
                             stacked_data = np.stack(data_subset)
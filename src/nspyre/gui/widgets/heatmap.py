@@ -1,21 +1,32 @@
 import time
 from functools import partial
+from importlib.util import find_spec
 from typing import Any
 from typing import Dict
+from typing import Optional
 
+import numpy as np
 from pyqtgraph import ImageView
 from pyqtgraph import PlotItem
+from pyqtgraph import setConfigOptions
 from pyqtgraph.colormap import getFromMatplotlib
 from pyqtgraph.Qt import QtCore
 from pyqtgraph.Qt import QtGui
 from pyqtgraph.Qt import QtWidgets
 
 from ..style._style import nspyre_font
+from ._axis import configure_axis
 from .update_loop import UpdateLoop
 
 
 class HeatMapWidget(QtWidgets.QWidget):
-    """Qt widget for displaying 2D data using pyqtgraph ImageView."""
+    """Qt widget for displaying 2D data using pyqtgraph ImageView.
+
+    If `numba <https://numba.pydata.org/>`__ is installed, the widget turns on
+    pyqtgraph's global :code:`useNumba` config option (unless :code:`use_numba` is
+    False). This applies to every pyqtgraph image in the application, not only
+    this widget.
+    """
 
     new_data = QtCore.Signal()
     """Qt Signal emitted when new data is available."""
@@ -28,6 +39,9 @@ class HeatMapWidget(QtWidgets.QWidget):
         lft_label: str = '',
         colormap=None,
         font: QtGui.QFont = nspyre_font,
+        max_fps: Optional[float] = None,
+        use_numba: bool = True,
+        single_precision: bool = False,
         **kwargs,
     ):
         """
@@ -39,9 +53,24 @@ class HeatMapWidget(QtWidgets.QWidget):
                 latest/api_reference/colormap.html#pyqtgraph.ColorMap>`__ object.
             font: Font to use in the plot title, axis labels, etc., although
                 the font type may not be fully honored.
+            max_fps: Maximum number of times per second to run
+                :py:meth:`update`. If None, it is run again as soon as it
+                returns.
+            use_numba: If True and numba is installed, enable pyqtgraph's
+                numba-compiled kernels for rescaling and colormapping images, which
+                are much faster than numpy for large images. This sets a global
+                pyqtgraph option.
+            single_precision: If True, convert float64 data passed to
+                :py:meth:`set_data` to float32, which halves the amount of memory
+                pyqtgraph processes per frame. Only use this if float32 can
+                resolve the data - e.g. it can't resolve a 2 kHz spread around
+                2.87 GHz, so the image and histogram would show rounded values.
         """
         super().__init__(*args, **kwargs)
 
+        if use_numba and find_spec('numba') is not None:
+            setConfigOptions(useNumba=True)
+
         if colormap is None:
             colormap = getFromMatplotlib('magma')
 
@@ -51,7 +80,10 @@ class HeatMapWidget(QtWidgets.QWidget):
         # pyqtgraph widget for displaying an Image (2d or 3d plot) and related
         # items like axes, legends, etc.
         self.plot_item = PlotItem()
+        # the data is stored in row-major order (set_data makes sure it's C
+        # contiguous), so pyqtgraph can render it without transposing it
         self.image_view = ImageView(view=self.plot_item)
+        self.image_view.getImageItem().setOpts(axisOrder='row-major')
         self.layout.addWidget(self.image_view)
 
         # plot settings
@@ -64,77 +96,90 @@ class HeatMapWidget(QtWidgets.QWidget):
 
         # axes
         self.btm_axis = self.plot_item.getAxis('bottom')
-        self.btm_axis.setLabel(text=btm_label)
-        self.btm_axis.label.setFont(font)
-        self.btm_axis.setTickFont(font)
-        self.btm_axis.enableAutoSIPrefix(False)
+        configure_axis(self.btm_axis, btm_label, font)
         self.lft_axis = self.plot_item.getAxis('left')
-        self.lft_axis.setLabel(text=lft_label)
-        self.lft_axis.label.setFont(font)
-        self.lft_axis.setTickFont(font)
-        self.lft_axis.enableAutoSIPrefix(False)
+        configure_axis(self.lft_axis, lft_label, font)
 
         # we keep a dict containing the x-axis, y-axis, z-axis (optional, only
-        # for 3D images), data, semaphore, and pyqtgraph PlotDataItem
-        # associated with each line plot
+        # for 3D images), and data currently being displayed
         self.image: Dict[str, Any] = {
             'x': [],
             'y': [],
             'z': None,
             'data': [],
-            'sem': QtCore.QSemaphore(n=1),
         }
+        # most recent (xs, ys, data, zs) passed to set_data that hasn't been
+        # displayed yet - older data that was never displayed is dropped
+        self.pending = None
+        # protect access to pending
+        self.pending_mutex = QtCore.QMutex()
+        self.single_precision = single_precision
 
         self.setLayout(self.layout)
 
-        # TODO
+        self.stopped = False
+        # clean up when the widget is destroyed
         self.destroyed.connect(partial(self._stop))
 
         # Plot setup code
         self.setup()
 
         # thread for updating the plot data
-        self.update_loop = UpdateLoop(self.update)
+        self.update_loop = UpdateLoop(self.update, max_fps=max_fps)
         # process new data when a signal is generated by the update thread
         self.new_data.connect(self._process_data)
         # start the thread
         self.update_loop.start()
 
     def _stop(self):
-        """ """
+        """Stop the plot updating thread, and run the
+        :py:meth:`~nspyre.gui.widgets.heatmap.HeatMapWidget.teardown` code."""
+        self.stopped = True
         self.update_loop.stop()
         self.teardown()
 
     def _process_data(self):
         """Update the color map triggered by set_data."""
-        try:
-            if self.image['z'] is None:
-                axes = {'x': 1, 'y': 0}
-            else:
-                axes = {'x': 1, 'y': 0, 't': 2}
-            z_index = self.image_view.currentIndex
-            xs, ys = self.image['x'], self.image['y']
-            x_mx, x_mn, y_mx, y_mn = max(xs), min(xs), max(ys), min(ys)
-            x_rng, y_rng = x_mx - x_mn, y_mx - y_mn
-            self.image_view.setImage(
-                self.image['data'],
-                pos=[x_mn, y_mn],
-                scale=[x_rng / len(xs), y_rng / len(ys)],
-                # scale=[(x_mx - x_mn), (y_mx - y_mn)],
-                autoRange=False,
-                autoLevels=True,
-                autoHistogramRange=False,
-                axes=axes,
-                levelMode='mono',
-                xvals=self.image['z'],
-            )
-
-            if z_index:
-                self.image_view.setCurrentIndex(z_index)
-        except Exception as exc:
-            raise exc
-        finally:
-            self.image['sem'].release()
+        with QtCore.QMutexLocker(self.pending_mutex):
+            pending = self.pending
+            self.pending = None
+        if pending is None:
+            # the data was already displayed by a previous call
+            return
+        xs, ys, data, zs = pending
+        self.image['x'] = xs
+        self.image['y'] = ys
+        if zs is not None:
+            self.image['z'] = zs
+        self.image['data'] = data
+
+        if data.ndim == 2:
+            axes = {'x': 1, 'y': 0}
+        else:
+            # set_data moved the z-axis to the front
+            axes = {'t': 0, 'x': 2, 'y': 1}
+        z_index = self.image_view.currentIndex
+        xs, ys = self.image['x'], self.image['y']
+        # the axes are sorted, so only the endpoints are needed to find their extent
+        # rather than searching the whole array
+        x_mn, x_mx = sorted((xs[0], xs[-1]))
+        y_mn, y_mx = sorted((ys[0], ys[-1]))
+        x_rng, y_rng = x_mx - x_mn, y_mx - y_mn
+        self.image_view.setImage(
+            self.image['data'],
+            pos=[x_mn, y_mn],
+            scale=[x_rng / len(xs), y_rng / len(ys)],
+            # scale=[(x_mx - x_mn), (y_mx - y_mn)],
+            autoRange=False,
+            autoLevels=True,
+            autoHistogramRange=False,
+            axes=axes,
+            levelMode='mono',
+            xvals=self.image['z'],
+        )
+
+        if z_index:
+            self.image_view.setCurrentIndex(z_index)
 
     def setup(self):
         """Subclasses should override this function to perform any setup code."""
@@ -150,7 +195,9 @@ class HeatMapWidget(QtWidgets.QWidget):
         pass
 
     def set_data(self, xs, ys, data, zs=None):
-        """Queue up x,y,z and data to update the color map. Threadsafe.
+        """Queue up x,y,z and data to update the color map. Threadsafe. Doesn't
+        block - if it is called again before the color map has been updated, only
+        the most recent data will be displayed.
 
         Args:
             name: Name of the plot.
@@ -162,27 +209,40 @@ class HeatMapWidget(QtWidgets.QWidget):
                 same length as the number of columns of data, and ys should
                 be the same length as the number of rows of data. This way,
                 when the widget attempts to display the pixel at (x, y), it
-                looks for it in data[y][x]. In the case of a 3D array, the
-                z-axis information should be in the last index, so that the
-                pixel at (x, y, z) is stored in data[y][x][z].
+                looks for it in data[y][x]. xs and ys should be sorted (in
+                either ascending or descending order). In the case of a 3D
+                array, the z-axis information should be in the last index, so
+                that the pixel at (x, y, z) is stored in data[y][x][z].
             zs: Optional array-like of data for the z-axis.
         Raises:
             ValueError: An error with the supplied arguments.
         """
-        # block until any previous calls to set_data have been fully processed
-        self.image['sem'].acquire()
-        # set the new x and y data
-        self.image['x'] = xs
-        self.image['y'] = ys
-        if zs is not None:
-            self.image['z'] = zs
-        self.image['data'] = data
-        # notify the watcher
+        data = np.asarray(data)
+        if self.single_precision and data.dtype == np.float64:
+            dtype = np.dtype(np.float32)
+        else:
+            dtype = data.dtype
+        if data.ndim == 3:
+            # move the z-axis to the front so that each frame is contiguous in
+            # memory when pyqtgraph slices out the current one
+            data = np.moveaxis(data, 2, 0)
+        # do any conversion in this thread rather than the GUI thread
+        data = np.ascontiguousarray(data, dtype=dtype)
+
+        with QtCore.QMutexLocker(self.pending_mutex):
+            # if there is already data pending, the GUI thread hasn't processed it
+            # yet and doesn't need to be notified again
+            notify = self.pending is None
+            if zs is None and not notify:
+                # keep the z-axis data from the pending call
+                zs = self.pending[3]
+            # replace any pending data with the new data
+            self.pending = (xs, ys, data, zs)
+        if not notify or self.stopped:
+            return
+        # notify that new data is available
         try:
-            self.parent()
+            self.new_data.emit()
         except RuntimeError:
-            # this Qt object has already been deleted
+            # this Qt object was deleted after the stopped check
             return
-        else:
-            # notify that new data is available
-            self.new_data.emit()
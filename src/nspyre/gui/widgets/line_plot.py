@@ -4,8 +4,11 @@ A wrapper for pyqtgraph PlotWidget.
 import logging
 import time
 from functools import partial
+from itertools import cycle
 from typing import Any
+from typing import Optional
 
+import numpy as np
 from pyqtgraph import mkColor
 from pyqtgraph import PlotWidget
 from pyqtgraph.Qt import QtCore
@@ -16,20 +19,74 @@ from ..style._colors import colors
 from ..style._colors import cyclic_colors
 from ..style._style import nspyre_font
 from ..threadsafe import QThreadSafeObject
+from ._axis import configure_axis
 from .update_loop import UpdateLoop
 
 _logger = logging.getLogger(__name__)
 
 
+class _SeriesBuffer:
+    """Buffer for efficiently appending x/y data to a plot series. The data
+    returned by :py:meth:`append` is a view into the buffer, which may still be in
+    use by the plot, so the data in the returned region is never modified
+    afterwards. When the buffer runs out of space, the data is copied into a new
+    buffer with twice the capacity, so appending is amortized O(new points)."""
+
+    def __init__(self):
+        # x data in row 0, y data in row 1
+        self.buf = np.empty((2, 0))
+        # region of the buffer that contains data
+        self.start = 0
+        self.end = 0
+
+    def append(self, xdata, ydata, max_points: Optional[int] = None):
+        """Append data to the buffer.
+
+        Args:
+            xdata: Array-like of x data to append.
+            ydata: Array-like of y data to append.
+            max_points: If not None, keep only the most recent max_points points.
+
+        Returns:
+            Tuple (x, y) of arrays containing all of the data in the buffer.
+        """
+        n = len(xdata)
+        if len(ydata) != n:
+            raise ValueError(
+                f'x data has length [{n}] but y data has length [{len(ydata)}].'
+            )
+        if max_points is not None:
+            # skip the points that would be discarded anyway
+            xdata = xdata[max(n - max_points, 0) :]
+            ydata = ydata[max(n - max_points, 0) :]
+            n = len(xdata)
+            self.start = max(self.start, self.end + n - max_points)
+        length = self.end - self.start + n
+        if self.end + n > self.buf.shape[1]:
+            # copy the data into a new buffer rather than moving it within the old
+            # one, since views of the old buffer may still be in use
+            buf = np.empty((2, 2 * length))
+            buf[:, : self.end - self.start] = self.buf[:, self.start : self.end]
+            self.buf = buf
+            self.start = 0
+            self.end = length - n
+        self.buf[0, self.end : self.end + n] = xdata
+        self.buf[1, self.end : self.end + n] = ydata
+        self.end += n
+        return self.buf[0, self.start : self.end], self.buf[1, self.start : self.end]
+
+
 class _PlotSeriesData(QtCore.QObject):
     """Container for the data of a single data series within a LinePlotWidget."""
 
     def __init__(self):
         super().__init__()
-        self.x = []
+        self.x = np.empty(0)
         """X data array."""
-        self.y = []
+        self.y = np.empty(0)
         """Y data array."""
+        self.buffer = None
+        """_SeriesBuffer holding x and y if the data was added using append_data."""
         self.plot_data_item = None
         """pyqtgraph PlotDataItem associated with the data."""
         self.hidden = False
@@ -43,8 +100,10 @@ class _LinePlotData(QThreadSafeObject):
         self.plots = {}
         """A dict mapping data set names (str) to a _PlotSeriesData associated with each
         line plot."""
-        # for blocking set_data until the data has been processed
-        self.sem = QtCore.QSemaphore(n=1)
+        self.dirty = set()
+        """Names of the plots with new data that hasn't been plotted yet."""
+        # protect access to dirty and the x/y data of the plots
+        self.dirty_mutex = QtCore.QMutex()
         super().__init__()
 
     def add_plot(self, name: str, callback=None, **kwargs):
@@ -145,26 +204,84 @@ class _LinePlotData(QThreadSafeObject):
             name: Name of the plot.
             xdata: Array-like of data for the x-axis.
             ydata: Array-like of data for the y-axis.
-            callback: Callback function to run (blocking) in the main thread.
+            callback: Callback function to run (non-blocking) in the main thread
+                to plot the data of all of the plots in :code:`dirty`. It is only
+                run if there isn't already a run pending, so that updates to
+                several plots are handled together.
         """
-        # block until any previous calls to set_data have been fully processed
-        self.sem.acquire()
-
         with QtCore.QMutexLocker(self.mutex):
             if name not in self.plots:
                 _logger.info(
                     f'A plot with the name [{name}] does not exist. Ignoring set_data '
                     'request.'
                 )
-                self.sem.release()
                 return
 
-            # set the new x and y data
-            self.plots[name].x = xdata
-            self.plots[name].y = ydata
+            with QtCore.QMutexLocker(self.dirty_mutex):
+                # set the new x and y data
+                self.plots[name].x = xdata
+                self.plots[name].y = ydata
+                self.plots[name].buffer = None
+                notify = self._mark_dirty(name)
 
-            if callback is not None:
-                self.run_main(callback, name, self.plots[name], blocking=True)
+            if notify and callback is not None:
+                self.run_main(callback)
+
+    def append_data(
+        self,
+        name: str,
+        xdata: Any,
+        ydata: Any,
+        max_points: Optional[int] = None,
+        callback=None,
+    ):
+        """Queue up x/y data to be appended to a plot series.
+
+        Args:
+            name: Name of the plot.
+            xdata: Array-like of data to append to the x-axis data.
+            ydata: Array-like of data to append to the y-axis data.
+            max_points: If not None, keep only the most recent max_points points.
+            callback: See :py:meth:`set_data`.
+        """
+        with QtCore.QMutexLocker(self.mutex):
+            if name not in self.plots:
+                _logger.info(
+                    f'A plot with the name [{name}] does not exist. Ignoring '
+                    'append_data request.'
+                )
+                return
+
+            plot_series_data = self.plots[name]
+            with QtCore.QMutexLocker(self.dirty_mutex):
+                if plot_series_data.buffer is None:
+                    # start with the existing data
+                    plot_series_data.buffer = _SeriesBuffer()
+                    plot_series_data.buffer.append(
+                        plot_series_data.x, plot_series_data.y
+                    )
+                plot_series_data.x, plot_series_data.y = plot_series_data.buffer.append(
+                    xdata, ydata, max_points=max_points
+                )
+                notify = self._mark_dirty(name)
+
+            if notify and callback is not None:
+                self.run_main(callback)
+
+    def _mark_dirty(self, name: str) -> bool:
+        """Mark a plot as having new data. Must be called with dirty_mutex held.
+
+        Args:
+            name: Name of the plot.
+
+        Returns:
+            True if the main thread callback needs to be run. If other plots are
+            already dirty, the callback has already been queued up and will also
+            plot this data.
+        """
+        notify = not self.dirty
+        self.dirty.add(name)
+        return notify
 
 
 class LinePlotWidget(QtWidgets.QWidget):
@@ -180,6 +297,9 @@ class LinePlotWidget(QtWidgets.QWidget):
         font: QtGui.QFont = nspyre_font,
         legend: bool = True,
         downsample: bool = True,
+        clip_to_view: bool = False,
+        opengl: bool = False,
+        max_fps: Optional[float] = None,
         **kwargs,
     ):
         """
@@ -196,6 +316,20 @@ class LinePlotWidget(QtWidgets.QWidget):
                 the 'mean' mode (see `PlotItem docs <https://pyqtgraph.readthedocs.io\
                 /en/latest/api_reference/graphicsItems/plotitem.html\
                 #pyqtgraph.PlotItem.setDownsampling>`__).
+            clip_to_view: If True, only process the data that is within the visible
+                x-axis range when the view is zoomed in (see `PlotItem docs \
+                <https://pyqtgraph.readthedocs.io/en/latest/api_reference/\
+                graphicsItems/plotitem.html#pyqtgraph.PlotItem.setClipToView>`__).
+                Combined with downsampling, this makes plotting very large data
+                sets much faster. The x data of every plot must be sorted in
+                increasing order.
+            opengl: If True, draw the plot using OpenGL, which moves the
+                rasterization of the lines onto the GPU. This can be much faster for
+                plots with many points that are updated frequently, but requires
+                OpenGL support on the system.
+            max_fps: Maximum number of times per second to run
+                :py:meth:`update`. If None, it is run again as soon as it
+                returns.
             kwargs: passed to the QWidget init, like
                 :code:`super().__init__(*args, **kwargs)`
         """
@@ -214,6 +348,11 @@ class LinePlotWidget(QtWidgets.QWidget):
             self.plot_widget.getPlotItem().setDownsampling(
                 ds=True, auto=True, mode='mean'
             )
+        if clip_to_view:
+            self.plot_widget.getPlotItem().setClipToView(True)
+
+        if opengl:
+            self.plot_widget.useOpenGL(True)
 
         self.layout.addWidget(self.plot_widget)
 
@@ -221,22 +360,17 @@ class LinePlotWidget(QtWidgets.QWidget):
         self.set_title(title)
         self.plot_widget.enableAutoRange(True)
         # colors
-        self.current_color_idx = 0
+        # cycle through the default colors for new plots
+        self.colors = cycle([mkColor(c) for c in cyclic_colors])
         self.plot_widget.setBackground(colors['black'])
         self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
 
         # x axis
         self.xaxis = self.plot_widget.getAxis('bottom')
-        self.xaxis.setLabel(text=xlabel)
-        self.xaxis.label.setFont(font)
-        self.xaxis.setTickFont(font)
-        self.xaxis.enableAutoSIPrefix(False)
+        configure_axis(self.xaxis, xlabel, font)
         # y axis
         self.yaxis = self.plot_widget.getAxis('left')
-        self.yaxis.setLabel(text=ylabel)
-        self.yaxis.label.setFont(font)
-        self.yaxis.setTickFont(font)
-        self.yaxis.enableAutoSIPrefix(False)
+        configure_axis(self.yaxis, ylabel, font)
 
         if legend:
             self.plot_widget.addLegend(labelTextSize=f'{font.pointSize()}pt')
@@ -251,7 +385,7 @@ class LinePlotWidget(QtWidgets.QWidget):
         self.plot_data.start()
 
         # for updating the plot data
-        self.update_loop = UpdateLoop(self.update)
+        self.update_loop = UpdateLoop(self.update, max_fps=max_fps)
 
         # plot setup code
         self.setup()
@@ -300,10 +434,7 @@ class LinePlotWidget(QtWidgets.QWidget):
 
     def _next_color(self):
         """Cycle through a set of colors"""
-        idx = self.current_color_idx % len(cyclic_colors)
-        color = mkColor(cyclic_colors[idx])
-        self.current_color_idx += 1
-        return color
+        return next(self.colors)
 
     def add_plot(
         self,
@@ -313,6 +444,7 @@ class LinePlotWidget(QtWidgets.QWidget):
         symbolPen=(255, 255, 255, 100),
         symbol: str = 's',
         symbolSize: int = 5,
+        cache_curve: bool = False,
         **kwargs,
     ):
         """Add a new plot to the PlotWidget. Thread safe.
@@ -329,14 +461,23 @@ class LinePlotWidget(QtWidgets.QWidget):
                 en/latest/graphicsItems/plotdataitem.html>`__.
             symbolSize: See `PlotDataItem docs <https://pyqtgraph.readthedocs.io/\
                 en/latest/graphicsItems/plotdataitem.html>`__.
+            cache_curve: If True, cache the rendered curve in a pixmap (Qt
+                DeviceCoordinateCache) so that it isn't redrawn when other items in
+                the view (e.g. a LinearRegionItem being dragged) are repainted. The
+                cache is invalidated whenever the data or view range changes, so
+                this only helps plots that are updated less often than they are
+                repainted.
             kwargs: Additional keyword arguments to pass to :code:`PlotWidget.plot`.
+                E.g. :code:`skipFiniteCheck=True` skips checking the data for NaN
+                or inf values on every update, which is faster for large plots if
+                the data is known to be finite.
         """
         if not pen:
             pen = self._next_color()
         self.plot_data.run_safe(
             self.plot_data.add_plot,
             name,
-            callback=self._add_plot_callback,
+            callback=partial(self._add_plot_callback, cache_curve=cache_curve),
             pen=pen,
             symbolBrush=symbolBrush,
             symbolPen=symbolPen,
@@ -345,9 +486,20 @@ class LinePlotWidget(QtWidgets.QWidget):
             **kwargs,
         )
 
-    def _add_plot_callback(self, name: str, plot_series_data: _PlotSeriesData, kwargs):
+    def _add_plot_callback(
+        self,
+        name: str,
+        plot_series_data: _PlotSeriesData,
+        kwargs,
+        cache_curve: bool = False,
+    ):
         """Helper for add_plot."""
-        plot_series_data.plot_data_item = self.plot_widget.plot(name=name, **kwargs)
+        plot_data_item = self.plot_widget.plot(name=name, **kwargs)
+        if cache_curve:
+            plot_data_item.curve.setCacheMode(
+                QtWidgets.QGraphicsItem.CacheMode.DeviceCoordinateCache
+            )
+        plot_series_data.plot_data_item = plot_data_item
 
     def remove_plot(self, name: str):
         """Remove a plot from the display and delete it's associated data. Thread safe.
@@ -404,8 +556,13 @@ class LinePlotWidget(QtWidgets.QWidget):
             name: Name of the plot.
             xdata: Array-like of data for the x-axis.
             ydata: Array-like of data for the y-axis.
-            blocking: Whether this method should block until the data has been plotted.
+            blocking: Whether this method should block until the data has been
+                queued up for plotting.
         """
+        # convert e.g. lists to numpy arrays in the calling thread rather than
+        # leaving it for pyqtgraph to do in the main thread
+        xdata = np.asarray(xdata)
+        ydata = np.asarray(ydata)
         self.plot_data.run_safe(
             self.plot_data.set_data,
             name,
@@ -415,23 +572,65 @@ class LinePlotWidget(QtWidgets.QWidget):
             callback=self._set_data_callback,
         )
 
-    def _set_data_callback(self, name: str, plot_series_data: _PlotSeriesData):
-        """Update a line plot triggered by set_data. Runs in the main thread.
+    def append_data(
+        self,
+        name: str,
+        xdata: Any,
+        ydata: Any,
+        max_points: Optional[int] = None,
+        blocking: bool = True,
+    ):
+        """Queue up x/y data to be appended to a line plot. This is more efficient
+        than calling :py:meth:`set_data` with all of the data every time a few
+        points are added. Thread safe.
 
         Args:
-            name: Name of plot series.
-            plot_series_data: _PlotSeriesData to update the plot for.
+            name: Name of the plot.
+            xdata: Array-like of data to append to the x-axis data.
+            ydata: Array-like of data to append to the y-axis data.
+            max_points: If not None, keep only the most recent max_points points.
+            blocking: Whether this method should block until the data has been
+                queued up for plotting.
         """
-        try:
-            plot_series_data.plot_data_item.setData(
-                plot_series_data.x, plot_series_data.y
-            )
-        except Exception as err:
-            if self.stopped:
-                return
-            else:
-                raise err
-        self.plot_data.sem.release()
+        xdata = np.atleast_1d(np.asarray(xdata))
+        ydata = np.atleast_1d(np.asarray(ydata))
+        self.plot_data.run_safe(
+            self.plot_data.append_data,
+            name,
+            xdata,
+            ydata,
+            max_points=max_points,
+            blocking=blocking,
+            callback=self._set_data_callback,
+        )
+
+    def _set_data_callback(self):
+        """Update all of the line plots that have new data, triggered by set_data.
+        Runs in the main thread."""
+        with QtCore.QMutexLocker(self.plot_data.dirty_mutex):
+            updates = []
+            for name in self.plot_data.dirty:
+                plot_series_data = self.plot_data.plots.get(name)
+                if plot_series_data is None:
+                    # the plot was removed
+                    continue
+                updates.append(
+                    (
+                        plot_series_data.plot_data_item,
+                        plot_series_data.x,
+                        plot_series_data.y,
+                    )
+                )
+            self.plot_data.dirty = set()
+
+        for plot_data_item, xdata, ydata in updates:
+            try:
+                plot_data_item.setData(xdata, ydata)
+            except Exception as err:
+                if self.stopped:
+                    return
+                else:
+                    raise err
 
     # TODO
     # def add_zoom_region(self):
@@ -1,6 +1,7 @@
 import logging
 import time
 from typing import Callable
+from typing import Optional
 
 from pyqtgraph.Qt import QtCore
 
@@ -21,6 +22,7 @@ class UpdateLoop(QThreadSafeObject):
         *args,
         report_fps: bool = False,
         fps_period: float = 1,
+        max_fps: Optional[float] = None,
         **kwargs,
     ):
         """
@@ -31,6 +33,8 @@ class UpdateLoop(QThreadSafeObject):
             report_fps: Whether to log the frames-per-second (how many times
                 update_func is running per second).
             fps_period: How often (s) to report the frames-per-second.
+            max_fps: Maximum number of times per second to run update_func. If
+                None, it is run again as soon as it returns.
         """
         super().__init__()
 
@@ -38,15 +42,14 @@ class UpdateLoop(QThreadSafeObject):
         self.args = args
         self.kwargs = kwargs
         self.running = False
+        self.max_fps = max_fps
 
         self.report_fps = report_fps
         self.fps_period = fps_period
         # keep track of how many times self._update is called in the fps_period
         self.fps_counter = 0
         # time since the last reporting of the plot update FPS
-        self.last_fps = time.time()
-        self.updated.connect(self._calc_fps)
-        self.run_safe(self._update)
+        self.last_fps = time.monotonic()
 
     def start(self):
         """Start the update loop."""
@@ -65,25 +68,34 @@ class UpdateLoop(QThreadSafeObject):
         if not self.running:
             return
 
+        start_time = time.monotonic()
+
         # run the update function
         self.update_func(*self.args, **self.kwargs)
 
         # notify that update_func has finished
         self.updated.emit()
 
+        if self.report_fps:
+            self._calc_fps()
+
         # queue up another update
-        self.run_safe(self._update)
+        if self.max_fps is None:
+            self.run_safe(self._update)
+        else:
+            # wait until the next update is due without blocking this thread
+            delay = 1 / self.max_fps - (time.monotonic() - start_time)
+            QtCore.QTimer.singleShot(max(round(delay * 1000), 0), self._update)
 
     def _calc_fps(self):
         """Calculate and report how many times per second update_func is being
         called."""
-        if self.report_fps:
-            self.fps_counter += 1
-            now = time.time()
-            # time difference since last FPS report
-            td = now - self.last_fps
-            if td > self.fps_period:
-                fps = self.fps_counter / td
-                _logger.debug(f'plotting FPS: {fps:0.3f}')
-                self.last_fps = now
-                self.fps_counter = 0
+        self.fps_counter += 1
+        now = time.monotonic()
+        # time difference since last FPS report
+        td = now - self.last_fps
+        if td > self.fps_period:
+            fps = self.fps_counter / td
+            _logger.debug(f'plotting FPS: {fps:0.3f}')
+            self.last_fps = now
+            self.fps_counter = 0
@@ -1,9 +1,14 @@
 import logging
+import socket
 import time
 
 import numpy as np
 from nspyre import DataSink
 from nspyre import DataSource
+from nspyre.data.server import _HEADER_STRUCT
+from nspyre.data.server import _NEGOTIATION_SOURCE
+from nspyre.data.server import _TIMEOUT
+from nspyre.data.server import DATASERV_PORT
 
 _logger = logging.getLogger(__name__)
 
@@ -111,3 +116,16 @@ def test_dataserv_push_no_pop(dataserv):
         assert not source._thread.is_alive()
 
         _logger.info(f'Completed [{100*(i+1)/nconnects:>5.1f}]%.')
+
+
+def test_dataserv_drop_silent_source(dataserv):
+    """Test that the data server drops a source that connects then stops sending
+    messages (including keepalives)."""
+    with socket.create_connection(('localhost', DATASERV_PORT)) as sock:
+        for msg in (_NEGOTIATION_SOURCE, b'drop_silent_source'):
+            sock.sendall(_HEADER_STRUCT.pack(len(msg)) + msg)
+        start_time = time.time()
+        sock.settimeout(_TIMEOUT + 5)
+        # the server closes the connection once the source has timed out
+        assert sock.recv(1) == b''
+        assert time.time() - start_time > _TIMEOUT - 1
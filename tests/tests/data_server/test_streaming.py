@@ -1,9 +1,16 @@
+import asyncio
 import logging
+import subprocess
+import sys
 import time
 
 import numpy as np
 from nspyre import DataSink
 from nspyre import DataSource
+from nspyre.data.streaming._pickle import _MAX_DIFF
+from nspyre.data.streaming._pickle import _squash_pickle_diff_queue
+from nspyre.data.streaming._pickle import serialize_pickle_diff
+from nspyre.data.streaming._pickle import streaming_pickle_diff
 from nspyre.data.streaming.list import StreamingList
 
 # from nspyre.misc.misc import _total_sizeof
@@ -13,6 +20,10 @@ _logger = logging.getLogger(__name__)
 NPUSHES = 1000
 
 
+def _neg(x):
+    return -x
+
+
 def test_dataserv_streaming_list():
     sl1 = StreamingList(['a', 'b', 'c'])
     sl2 = StreamingList(['e', 'f', 'g'])
@@ -30,9 +41,7 @@ def test_dataserv_streaming_list():
         ('i', 1, 'b'),
         ('i', 2, 'c'),
         ('i', 3, 'd'),
-        ('i', 4, 'e'),
-        ('i', 5, 'f'),
-        ('i', 6, 'g'),
+        ('e', 4, ['e', 'f', 'g']),
     ]
     sl1[0] = 'x'
     assert sl1 == ['x', 'b', 'c', 'd', 'e', 'f', 'g']
@@ -41,9 +50,7 @@ def test_dataserv_streaming_list():
         ('i', 1, 'b'),
         ('i', 2, 'c'),
         ('i', 3, 'd'),
-        ('i', 4, 'e'),
-        ('i', 5, 'f'),
-        ('i', 6, 'g'),
+        ('e', 4, ['e', 'f', 'g']),
         ('u', 0, 'x'),
     ]
     sl1[0:2] = ['y', 'z']
@@ -53,9 +60,7 @@ def test_dataserv_streaming_list():
         ('i', 1, 'b'),
         ('i', 2, 'c'),
         ('i', 3, 'd'),
-        ('i', 4, 'e'),
-        ('i', 5, 'f'),
-        ('i', 6, 'g'),
+        ('e', 4, ['e', 'f', 'g']),
         ('u', 0, 'x'),
         ('u', slice(0, 2), ['y', 'z']),
     ]
@@ -72,8 +77,7 @@ def test_dataserv_streaming_list():
         ('i', 4, 'e'),
         ('i', 5, 'f'),
         ('i', 6, 'g'),
-        ('i', 7, 'h'),
-        ('i', 8, 'i'),
+        ('e', 7, ['h', 'i']),
     ]
     sl3.remove('h')
     assert sl3 == ['y', 'z', 'c', 'd', 'e', 'f', 'g', 'i']
@@ -85,8 +89,7 @@ def test_dataserv_streaming_list():
         ('i', 4, 'e'),
         ('i', 5, 'f'),
         ('i', 6, 'g'),
-        ('i', 7, 'h'),
-        ('i', 8, 'i'),
+        ('e', 7, ['h', 'i']),
         ('d', 7),
     ]
     sl4 = StreamingList([1, 2]) * 3
@@ -94,10 +97,8 @@ def test_dataserv_streaming_list():
     assert sl4.diff_ops == [
         ('i', 0, 1),
         ('i', 1, 2),
-        ('i', 2, 1),
-        ('i', 3, 2),
-        ('i', 4, 1),
-        ('i', 5, 2),
+        ('e', 2, [1, 2]),
+        ('e', 4, [1, 2]),
     ]
     sl4.pop(0)
     sl4.pop(1)
@@ -105,18 +106,82 @@ def test_dataserv_streaming_list():
     assert sl4.diff_ops == [
         ('i', 0, 1),
         ('i', 1, 2),
-        ('i', 2, 1),
-        ('i', 3, 2),
-        ('i', 4, 1),
-        ('i', 5, 2),
+        ('e', 2, [1, 2]),
+        ('e', 4, [1, 2]),
         ('d', 0),
         ('d', 1),
     ]
     sl4._clear_diff_ops()
-    sl4._merge([('d', 0), ('i', 0, 3)])
+    sl4._merge([bytearray(b'di'), [0, 0], [None, 3]])
     assert sl4 == [3, 2, 1, 2]
-    sl4._merge([('d', 1), ('u', 2, 'a')])
+    sl4._merge([bytearray(b'du'), [1, 2], [None, 'a']])
     assert sl4 == [3, 1, 'a']
+    sl4.clear()
+    assert sl4 == []
+    assert sl4.diff_ops == [('c',)]
+    sl4._clear_diff_ops()
+    sl4._merge([bytearray(b'ici'), [0, None, 0], [1, None, 2]])
+    assert sl4 == [2]
+    sl5 = StreamingList([3, 1, 2])
+    sl5._clear_diff_ops()
+    sl5.sort()
+    sl5.reverse()
+    assert sl5 == [3, 2, 1]
+    assert sl5.diff_ops == [('s', {'key': None, 'reverse': False}), ('r',)]
+    sl5._clear_diff_ops()
+    sl5.sort(key=lambda x: -x)
+    assert sl5.diff_ops == [('u', slice(None), [3, 2, 1])]
+    sl5._clear_diff_ops()
+    sl5.sort(reverse=True)
+    assert sl5.diff_ops == [('s', {'key': None, 'reverse': True})]
+    sl6 = StreamingList([3, 1, 2])
+    sl6._clear_diff_ops()
+    sl6._merge([bytearray(b'sr'), [None, None], [{'key': abs, 'reverse': True}, None]])
+    assert sl6 == [1, 2, 3]
+    sl6._merge([bytearray(b'e'), [3], [[4, 5]]])
+    assert sl6 == [1, 2, 3, 4, 5]
+    sl6.extend(sl6)
+    assert sl6 == [1, 2, 3, 4, 5, 1, 2, 3, 4, 5]
+    assert sl6.diff_ops == [('e', 5, [1, 2, 3, 4, 5])]
+
+
+def test_dataserv_streaming_diff_len():
+    """A single large extend or bulk update must count towards the max diff size
+    as much as the equivalent individual operations."""
+    n = int(_MAX_DIFF) + 1
+    sl = StreamingList()
+    streaming_pickle_diff(sl)
+    sl.extend(range(n))
+    pickle_diff = streaming_pickle_diff(sl)
+    assert len(pickle_diff) == n
+    # the memory backstop is tripped
+    assert not _squash_pickle_diff_queue(asyncio.Queue(), pickle_diff)
+    sl.sort(key=_neg)
+    sl.append(0)
+    assert len(streaming_pickle_diff(sl)) == n + 1
+
+
+def test_dataserv_streaming_list_sort_key(tmp_path):
+    """A sort with a key function must produce a diff that a process without
+    access to the key function (like the data server) can load."""
+    sl = StreamingList([3, 1, 2])
+    streaming_pickle_diff(sl)
+    sl.sort(key=_neg)
+    assert sl.diff_ops == [('u', slice(None), [3, 2, 1])]
+    data = serialize_pickle_diff(streaming_pickle_diff(sl))
+    # load the diff in a fresh interpreter that can't import this test module
+    subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import sys\n'
+            'from nspyre.data.streaming._pickle import deserialize_pickle_diff\n'
+            'deserialize_pickle_diff(sys.stdin.buffer.read())',
+        ],
+        input=data,
+        cwd=tmp_path,
+        check=True,
+    )
 
 
 def test_dataserv_streaming_push_pop(dataserv):
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from nspyre.gui.widgets.flex_line_plot import _AppendBuffer
+from nspyre.gui.widgets.line_plot import _SeriesBuffer
+
+
+def _rand_array(n, dtype=float):
+    return np.random.randint(0, 100, size=(2, n)).astype(dtype)
+
+
+def test_append_buffer():
+    """Test _AppendBuffer against np.concatenate while the list of arrays is
+    appended to, modified, and shrunk."""
+    buf = _AppendBuffer()
+    assert buf.concatenate([]).shape == (2, 0)
+
+    arrays = []
+    for _ in range(200):
+        action = np.random.randint(0, 6)
+        if action == 0 and arrays:
+            # replace an array
+            arrays[np.random.randint(0, len(arrays))] = _rand_array(
+                np.random.randint(0, 10)
+            )
+        elif action == 1 and arrays:
+            # shrink the list
+            del arrays[np.random.randint(0, len(arrays)) :]
+        elif action == 2:
+            # append an array with a different dtype
+            arrays.append(_rand_array(np.random.randint(0, 10), dtype=np.int32))
+        else:
+            # append some arrays
+            for _ in range(np.random.randint(1, 4)):
+                arrays.append(_rand_array(np.random.randint(0, 10)))
+
+        result = buf.concatenate(arrays)
+        expected = np.concatenate(arrays, axis=1) if arrays else np.empty((2, 0))
+        assert np.array_equal(result, expected)
+
+    # a view returned earlier isn't modified when the list is later replaced
+    arrays = [_rand_array(5)]
+    view = buf.concatenate(arrays)
+    expected = view.copy()
+    buf.concatenate([_rand_array(5)])
+    assert np.array_equal(view, expected)
+
+
+def test_series_buffer():
+    """Test _SeriesBuffer against a plain python list while data is appended, with
+    and without a max_points window."""
+    buf = _SeriesBuffer()
+    ref_x = []
+    ref_y = []
+    views = []
+    for _ in range(500):
+        n = np.random.randint(0, 20)
+        xdata = np.random.rand(n)
+        ydata = np.random.rand(n)
+        max_points = np.random.choice([None, 0, 1, 5, 30, 100])
+        x, y = buf.append(xdata, ydata, max_points=max_points)
+        ref_x.extend(xdata)
+        ref_y.extend(ydata)
+        if max_points is not None:
+            del ref_x[: max(len(ref_x) - max_points, 0)]
+            del ref_y[: max(len(ref_y) - max_points, 0)]
+        assert np.array_equal(x, ref_x)
+        assert np.array_equal(y, ref_y)
+        views.append((x, y, x.copy(), y.copy()))
+
+    # views returned earlier are never modified by later appends
+    for x, y, x_copy, y_copy in views:
+        assert np.array_equal(x, x_copy)
+        assert np.array_equal(y, y_copy)
+
+
+def test_series_buffer_max_points_zero():
+    buf = _SeriesBuffer()
+    buf.append([1, 2, 3], [4, 5, 6])
+    x, y = buf.append([7], [8], max_points=0)
+    assert len(x) == 0
+    assert len(y) == 0
+    x, y = buf.append([9], [10])
+    assert np.array_equal(x, [9])
+    assert np.array_equal(y, [10])
+
+
+def test_series_buffer_length_mismatch():
+    buf = _SeriesBuffer()
+    with pytest.raises(ValueError):
+        buf.append([1, 2, 3], [4, 5])